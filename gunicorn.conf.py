@@ -0,0 +1,12 @@
+# Gunicorn settings for serving the Flask app in production
+import multiprocessing
+import os
+
+chdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+wsgi_app = "app:app"
+bind = "0.0.0.0:5000"
+
+# gevent workers yield while waiting on Overpass, so each process serves many requests at once
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_class = "gevent"
+timeout = 90
@@ -1,109 +1,396 @@
 ﻿from flask import Flask, request, jsonify, render_template
+from flask.json.provider import JSONProvider
+from flask_caching import Cache
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError as Urllib3Error
+import ijson
+import orjson
 import osm2geojson  
 import os
 import math
+import time
+import tempfile
+import contextlib
+import logging
+import bisect
+import itertools
+from types import MappingProxyType
+from way_index import WayIndex, tile_bounds, tiles_covering
+
+class OrjsonProvider(JSONProvider):
+    """Serializes jsonify responses with orjson instead of the stdlib json module."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__, template_folder="../templates")
+app.json = OrjsonProvider(app)
 
-def fetch_osm_data(query):
-    """Fetches data from the Overpass API using the provided query."""
-    overpass_url = "http://overpass-api.de/api/interpreter"
-    response = requests.get(overpass_url, params={'data': query})
-    return response.json() if response.status_code == 200 else None
+logger = logging.getLogger(__name__)
 
-def get_speed_limit(value):
-    """Converts a speed limit value to an integer; returns 50 if conversion fails."""
+OVERPASS_URL = "http://overpass-api.de/api/interpreter"
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache")
+CACHE_TTL = 24 * 60 * 60  # Seconds before a cached Overpass response is fetched again
+CACHE_VERSION = 3  # Bump when the cached tile format changes so stale files are ignored
+COORD_PRECISION = 3  # ~110 m, so requests for nearby points share cache entries
+METERS_PER_DEGREE = 111000  # Approximate length of one degree of latitude
+MAX_INDEXED_RECORDS = 200000  # Ways each worker keeps in its R-tree before evicting the least recently used tiles
+MAX_TILES_PER_REQUEST = 48  # Larger areas (close to the poles) are queried directly instead of by tile
+
+# Ways downloaded so far; areas whose tiles are all loaded are answered without querying Overpass
+WAY_INDEX = WayIndex(ttl=CACHE_TTL, max_records=MAX_INDEXED_RECORDS)
+
+# Area statistics cache shared by all workers when CACHE_REDIS_URL points at Redis; per-process otherwise
+app.config["CACHE_TYPE"] = "RedisCache" if os.environ.get("CACHE_REDIS_URL") else "SimpleCache"
+app.config["CACHE_REDIS_URL"] = os.environ.get("CACHE_REDIS_URL")
+app.config["CACHE_DEFAULT_TIMEOUT"] = CACHE_TTL
+cache = Cache(app)
+
+# Pooled session so Overpass connections are reused across requests; retries back off on rate limiting
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504]),
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+def parse_coordinates(lat, lon):
+    """Parses lat/lon query arguments into floats; raises ValueError if they are not numbers within range."""
+    lat, lon = float(lat), float(lon)
+    # The chained comparisons are also False for NaN
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Coordinates out of range: {lat}, {lon}")
+    return lat, lon
+
+def quantize_coord(value):
+    """Rounds a coordinate to COORD_PRECISION decimals."""
+    return round(value, COORD_PRECISION)
+
+def tile_cache_path(tile):
+    """Returns the disk cache file of a grid tile."""
+    row, column = tile
+    return os.path.join(CACHE_DIR, f"v{CACHE_VERSION}_tile_{row}_{column}.json")
+
+def bounding_boxes(lat, lon, radius):
+    """
+    Returns the (south, west, north, east) boxes enclosing the circle of radius meters around lat/lon.
+    A circle crossing the antimeridian is split into one box on each side of it.
+    """
+    lat_delta = radius / METERS_PER_DEGREE
+    lon_delta = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    south, north = max(lat - lat_delta, -90.0), min(lat + lat_delta, 90.0)
+    west, east = lon - lon_delta, lon + lon_delta
+    if lon_delta >= 180:
+        return [(south, -180.0, north, 180.0)]
+    if west < -180:
+        return [(south, -180.0, north, east), (south, west + 360, north, 180.0)]
+    if east > 180:
+        return [(south, west, north, 180.0), (south, -180.0, north, east - 360)]
+    return [(south, west, north, east)]
+
+def _read_cache_file(path):
+    """Returns (cached JSON, modification time) for path, or (None, None) if it is missing or older than CACHE_TTL."""
+    try:
+        mtime = os.path.getmtime(path)
+        if time.time() - mtime > CACHE_TTL:
+            return None, None
+        with open(path, "rb") as f:
+            return orjson.loads(f.read()), mtime
+    except (OSError, ValueError):
+        return None, None
+
+def _write_cache_file(path, data):
+    """
+    Atomically writes data as JSON to path so concurrent readers never see a partial file.
+    The cache is best effort: write errors are logged and otherwise ignored.
+    """
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A unique temporary file per writer, so concurrent threads never share one
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(data))
+        os.replace(tmp_path, path)
+    except OSError:
+        logger.warning("Could not write cache file %s", path, exc_info=True)
+        if tmp_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+class OverpassIncompleteError(Exception):
+    """Raised when Overpass reports through a "remark" that it stopped before returning every element."""
+
+def stream_osm_elements(query):
+    """
+    Yields the elements of an Overpass response one at a time instead of parsing the whole payload.
+
+    Overpass answers HTTP 200 with a "remark" after the elements when it hits its timeout or memory
+    limit, so OverpassIncompleteError is raised once the stream is consumed if one was sent.
+    """
+    with SESSION.get(OVERPASS_URL, params={'data': query}, timeout=(3, 60), stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True  # Let urllib3 undo any gzip encoding
+        builder = None
+        for prefix, event, value in ijson.parse(response.raw, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == "elements.item" and event == "end_map":
+                    yield builder.value
+                    builder = None
+            elif prefix == "elements.item" and event == "start_map":
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            elif prefix == "remark":
+                raise OverpassIncompleteError(value)
+
+# Overpass query templates, kept free of indentation so no whitespace is sent over the wire.
+# Only tags are read, so "out tags center" skips each way's node list.
+# The timeout stays below the read timeout of stream_osm_elements so Overpass gives up first.
+TILE_QUERY_TMPL = "[out:json][timeout:50][maxsize:268435456];{statements}"
+AREA_QUERY_TMPL = "[out:json][timeout:50][maxsize:268435456];({statements});out tags center;"
+# The bounding box is checked before the more expensive around: filter; one pair of statements per box
+AREA_STATEMENTS_TMPL = (
+    'way({0:.6f},{1:.6f},{2:.6f},{3:.6f})(around:{radius},{lat:.6f},{lon:.6f})["highway"];'
+    'way({0:.6f},{1:.6f},{2:.6f},{3:.6f})(around:{radius},{lat:.6f},{lon:.6f})["building"];'
+)
+# Each tile is output separately, after a "tile" marker element made by Overpass, so the ways crossing
+# several tiles of a batch are listed under every one of them.
+TILE_STATEMENTS_TMPL = (
+    'make tile row="{4}",column="{5}";out;'
+    '(way({0:.6f},{1:.6f},{2:.6f},{3:.6f})["highway"];way({0:.6f},{1:.6f},{2:.6f},{3:.6f})["building"];);'
+    'out tags center;'
+)
+
+def way_record(element):
+    """Reduces a way element to the record kept in WAY_INDEX, or None if Overpass returned no center for it."""
+    center = element.get("center")
+    if not center:
+        return None
+    tags = element.get("tags", {})
+    return (
+        element["id"],
+        center["lat"],
+        center["lon"],
+        "highway" in tags,
+        "building" in tags,
+        tags.get("maxspeed"),
+        tags.get("building:levels") or tags.get("levels")
+    )
+
+def fetch_tiles(tiles):
+    """
+    Downloads the roads and buildings of several tiles in one Overpass query, grouped by tile.
+
+    Every way is filed under each tile its geometry crosses, wherever its center lies, so a tile holds
+    the same ways whichever other tiles it was downloaded with.
+    """
+    statements = "".join(TILE_STATEMENTS_TMPL.format(*tile_bounds(tile), *tile) for tile in tiles)
+    query = TILE_QUERY_TMPL.format(statements=statements)
+    records = {tile: [] for tile in tiles}
+    tile = None
+    for element in stream_osm_elements(query):
+        if element.get("type") == "tile":
+            tile = (int(element["tags"]["row"]), int(element["tags"]["column"]))
+            continue
+        record = way_record(element)
+        if record and tile in records:
+            records[tile].append(record)
+    return records
+
+def load_tiles(tiles):
+    """Makes sure every tile is in WAY_INDEX, reading it from the disk cache or downloading the missing ones together."""
+    to_fetch = []
+    for tile in tiles:
+        if WAY_INDEX.has_tile(tile):
+            continue
+        records, mtime = _read_cache_file(tile_cache_path(tile))
+        if records is None:
+            to_fetch.append(tile)
+        else:
+            # Expire the tile in memory when its file would expire on disk
+            WAY_INDEX.add_tile(tile, records, loaded_at=mtime)
+    if to_fetch:
+        for tile, records in fetch_tiles(to_fetch).items():
+            _write_cache_file(tile_cache_path(tile), records)
+            WAY_INDEX.add_tile(tile, records)
+
+def summarize_records(records):
+    """Counts roads and buildings in a list of way records and sums their speed limits and floors in a single pass."""
+    road_count = building_count = 0
+    speed_total = speed_count = 0
+    floor_total = floor_count = 0
+    for _, _, _, is_road, is_building, maxspeed, level_value in records:
+        if is_road:
+            road_count += 1
+            if maxspeed is not None:
+                speed_total += get_speed_limit(maxspeed)
+                speed_count += 1
+        if is_building:
+            building_count += 1
+            levels = get_building_levels(level_value)
+            if levels is not None:
+                floor_total += levels
+                floor_count += 1
+    return {
+        "road_count": road_count,
+        "building_count": building_count,
+        "speed_total": speed_total,
+        "speed_count": speed_count,
+        "floor_total": floor_total,
+        "floor_count": floor_count
+    }
+
+EMPTY_SUMMARY = summarize_records([])
+
+def fetch_area_records(lat, lon, radius, bboxes):
+    """Downloads the roads and buildings within radius meters of lat/lon directly, without going through the tile index."""
+    statements = "".join(AREA_STATEMENTS_TMPL.format(*bbox, lat=lat, lon=lon, radius=radius) for bbox in bboxes)
+    query = AREA_QUERY_TMPL.format(statements=statements)
+    return [record for record in map(way_record, stream_osm_elements(query)) if record]
+
+def fetch_osm_summary(lat, lon, radius):
+    """Summarizes the roads and buildings centered within radius meters of lat/lon, or returns None if Overpass could not be queried."""
+    bboxes = bounding_boxes(lat, lon, radius)
+    tiles = [tile for bbox in bboxes for tile in tiles_covering(*bbox)]
     try:
-        return int(value)
-    except (ValueError, TypeError):
-        return 50  # Default speed if conversion fails
-
-def get_building_levels(elements):
-    """Extracts the building levels (number of floors) from a list of building elements."""
-    levels = []
-    for element in elements:
-        if "tags" in element:
-            level_value = element["tags"].get("building:levels") or element["tags"].get("levels")
-            if level_value:
+        records = None
+        if len(tiles) <= MAX_TILES_PER_REQUEST:
+            # Pinned so loading the last tiles of a dense area cannot evict the first ones
+            with WAY_INDEX.pinned(tiles):
                 try:
-                    levels.append(int(level_value))
-                except ValueError:
-                    pass  # Skip if conversion fails
-    return levels
+                    load_tiles(tiles)
+                except OverpassIncompleteError:
+                    # The tiles cover several times the circle's area; the smaller direct query may still fit Overpass's limits
+                    logger.warning("Overpass could not return the tiles around %s, %s; querying the area directly", lat, lon)
+                else:
+                    records = WAY_INDEX.query(lat, lon, radius, bboxes, tiles)
+        if records is None:
+            # Too many tiles, or one of them expired between loading and querying
+            records = fetch_area_records(lat, lon, radius, bboxes)
+    except (requests.RequestException, Urllib3Error, ijson.JSONError, OverpassIncompleteError):
+        return None
+    return summarize_records(records)
+
+def get_speed_limit(value):
+    """Converts a speed limit value to an integer; returns 50 if it is not a plain number (surrounding whitespace is allowed)."""
+    # A predicate check is much cheaper than raising for values like "walk" or "RO:urban"
+    value = value.strip() if value else value
+    return int(value) if value and value.isdecimal() else 50  # Default speed if conversion fails
+
+def get_building_levels(value):
+    """Converts a building levels value (number of floors) to an integer; returns None if it is not a plain number (surrounding whitespace is allowed)."""
+    value = value.strip() if value else value
+    return int(value) if value and value.isdecimal() else None
+
+AREA_KM2_5KM = math.pi * 25.0  # Area of the 5 km search circle used by every request
 
 def estimate_population_density(building_count, avg_floors, radius=5000, occupants_per_floor=30):
     """Estimates population density (people per km²) based on building and population data."""
-    area_km2 = math.pi * ((radius / 1000) ** 2)
+    area_km2 = AREA_KM2_5KM if radius == 5000 else math.pi * ((radius / 1000) ** 2)
     estimated_population = building_count * avg_floors * occupants_per_floor
     return estimated_population / area_km2 if area_km2 > 0 else 0
 
-def determine_5g_config(avg_speed, population_density, avg_floors, building_count):
-    """Determines the 5G configuration based on speed, density, and building data, using only 24 GHz, 3.5 GHz, and 700 MHz."""
+# Area types by population density (people per km²): below 10000, below 50000, and above
+DENSITY_BOUNDS = (10000, 50000)
+AREA_TYPES = ("Rural/Mountain", "Urban", "Big Capital")
 
-    # Classify area based on both population and building density
-    if population_density >= 50000:
-        area_type = "Big Capital"
-    elif 10000 <= population_density < 50000:
-        area_type = "Urban"
-    else:
-        area_type = "Rural/Mountain"
+# Building count bins: up to 50, up to 500, below 10000, and 10000 or more
+BUILDING_COUNT_BOUNDS = (51, 501, 10000)
 
-    # Assign frequency based on area type and building count
-    if area_type == "Big Capital":
-        frequency = "24 GHz" if building_count < 10000 else "3.5 GHz"  # High-band only if buildings are low in number
-    elif area_type == "Urban":
-        # In urban areas, choose frequency based on building count and average building floors.
-        if 1000 < building_count <= 10000:
-            if  avg_floors <= 7:
-                frequency = "3.5 GHz"
-            else:
-                frequency = "700 MHz"  # Dense urban core but with lower-rise buildings
-        elif building_count > 500:
-            # check the average floors to adjust the frequency.
-            if  avg_floors <= 7:
-                frequency = "3.5 GHz"
-            else:
-                frequency = "700 MHz"
-        else:
-            frequency = "24 GHz"   # Less dense urban areas
-    elif area_type == "Rural/Mountain":
-        # In rural areas, decide based on the presence of clustered buildings.
-        if building_count > 50:
-            # Adjust frequency based on average speed,
-            # which might indicate vehicular density or road conditions.
-            if avg_speed < 50:
-                frequency = "3.5 GHz"  # When speeds are lower, a higher frequency might be acceptable
-            else:
-                frequency = "700 MHz"  # For higher speeds, extended coverage with 700 MHz is preferred
-        else:
-            frequency = "700 MHz"  # Very sparse rural regions for extended coverage
+# Average floor bins: up to 7 floors, and higher
+FLOOR_BOUNDS = (7,)
 
-    # Cyclic prefix assignment
-    cyclic_prefix = "Normal" if area_type in ["Big Capital", "Urban"] else "Extended"
+# Average speed bins used for rural frequency selection: below 50 km/h, and 50 or more
+RURAL_SPEED_BOUNDS = (50,)
 
-    # Adjust subcarrier spacing based on area type
-    if avg_speed <= 45:
-        subcarrier = "15 kHz"
-    elif 45 < avg_speed > 70:
-        subcarrier = "30 kHz"
-    elif avg_speed > 70:
-        subcarrier = "120 kHz"
-    else:
-        subcarrier = "30 kHz"  # Default value 
+# Subcarrier spacing by average speed: up to 45 km/h, up to 70 km/h, and faster
+SUBCARRIER_SPEED_BOUNDS = (45, 70)
+SUBCARRIERS = ("15 kHz", "30 kHz", "120 kHz")
 
-    return {
-        "subcarrier": subcarrier,
-        "frequency": frequency,
-        "cyclic_prefix": cyclic_prefix,
+def _frequency_for_bins(area_type, count_bin, floor_bin, speed_bin):
+    """Returns the frequency band for one combination of area type and bins."""
+    if area_type == "Big Capital":
+        # High-band only if buildings are low in number
+        return "24 GHz" if count_bin < 3 else "3.5 GHz"
+    if area_type == "Urban":
+        # Urban areas with more than 500 buildings drop to 700 MHz when buildings average more than 7 floors
+        if count_bin < 2:
+            return "24 GHz"  # Less dense urban areas
+        return "3.5 GHz" if floor_bin == 0 else "700 MHz"
+    # Rural areas with clustered buildings use 3.5 GHz when lower speeds allow it, 700 MHz for extended coverage otherwise
+    return "3.5 GHz" if count_bin > 0 and speed_bin == 0 else "700 MHz"
+
+# Every possible configuration, keyed by (area type, building count bin, floor bin, rural speed bin, subcarrier bin).
+# Entries are read-only since they are shared by every request.
+CONFIG_TABLE = {
+    (area_type, count_bin, floor_bin, speed_bin, subcarrier_bin): MappingProxyType({
+        "subcarrier": SUBCARRIERS[subcarrier_bin],
+        "frequency": _frequency_for_bins(area_type, count_bin, floor_bin, speed_bin),
+        "cyclic_prefix": "Normal" if area_type in ["Big Capital", "Urban"] else "Extended",
         "area_type": area_type
-    }
+    })
+    for area_type, count_bin, floor_bin, speed_bin, subcarrier_bin in itertools.product(
+        AREA_TYPES,
+        range(len(BUILDING_COUNT_BOUNDS) + 1),
+        range(len(FLOOR_BOUNDS) + 1),
+        range(len(RURAL_SPEED_BOUNDS) + 1),
+        range(len(SUBCARRIERS)),
+    )
+}
 
+def determine_5g_config(avg_speed, population_density, avg_floors, building_count):
+    """Determines the 5G configuration based on speed, density, and building data, using only 24 GHz, 3.5 GHz, and 700 MHz.
+
+    Returns a read-only mapping shared between calls.
+    """
+    key = (
+        AREA_TYPES[bisect.bisect_right(DENSITY_BOUNDS, population_density)],
+        bisect.bisect_right(BUILDING_COUNT_BOUNDS, building_count),
+        bisect.bisect_left(FLOOR_BOUNDS, avg_floors),
+        bisect.bisect_right(RURAL_SPEED_BOUNDS, avg_speed),
+        bisect.bisect_left(SUBCARRIER_SPEED_BOUNDS, avg_speed),
+    )
+    return CONFIG_TABLE[key]
+
+def compute_area_stats(summary):
+    """Derives the road, building and 5G configuration statistics of an area from its Overpass summary."""
+    road_count = summary["road_count"]
+    building_count = summary["building_count"]
+
+    avg_speed = summary["speed_total"] / summary["speed_count"] if summary["speed_count"] else 50
+    avg_floors = summary["floor_total"] / summary["floor_count"] if summary["floor_count"] else 1  # Default to 1 floor if no data
 
+    # Estimate population density
+    population_density = estimate_population_density(building_count, avg_floors, radius=5000, occupants_per_floor=30)
+
+    # Corrected function call by passing `building_count`
+    config = determine_5g_config(avg_speed, population_density, avg_floors, building_count)
 
+    return {
+        "avg_speed": avg_speed,
+        "road_count": road_count,
+        "building_count": building_count,
+        "avg_floors": avg_floors,
+        "population_density": population_density,
+        "config": dict(config)  # Plain dict so it can be pickled by the cache and serialized by orjson
+    }
 
+@cache.memoize(timeout=CACHE_TTL)
+def get_area_stats(query_lat, query_lon):
+    """Returns the statistics of the 5km area around a quantized coordinate, or None if Overpass could not be queried.
 
+    None results are not cached, so failed lookups are retried on the next request.
+    """
+    summary = fetch_osm_summary(query_lat, query_lon, 5000)
+    return compute_area_stats(summary) if summary else None
 
 @app.route("/")
 def home():
@@ -117,64 +404,29 @@ def get_5g_config():
     if not lat or not lon:
         return jsonify({"error": "Missing lat/lon"}), 400
 
-    # Query road data within a 5km radius
-    road_query = f"""
-    [out:json];
-    way(around:5000,{lat},{lon})["highway"];
-    out body;
-    """
-    road_data = fetch_osm_data(road_query)
-
-    if road_data and "elements" in road_data:
-        speed_values = [
-            get_speed_limit(way["tags"].get("maxspeed", "50"))
-            for way in road_data["elements"]
-            if "tags" in way and "maxspeed" in way["tags"]
-        ]
-        avg_speed = sum(speed_values) / len(speed_values) if speed_values else 50
-        road_count = len(road_data["elements"])
-    else:
-        avg_speed = 50
-        road_count = 0
-
-    # Query building data within a 5km radius
-    building_query = f"""
-    [out:json];
-    way(around:5000,{lat},{lon})["building"];
-    out body;
-    """
-    building_data = fetch_osm_data(building_query)
-
-    if building_data and "elements" in building_data:
-        building_count = len(building_data["elements"])
-        floor_list = get_building_levels(building_data["elements"])
-        avg_floors = sum(floor_list) / len(floor_list) if floor_list else 1  # Default to 1 floor if no data
-    else:
-        building_count = 0
-        avg_floors = 1
+    try:
+        lat, lon = parse_coordinates(lat, lon)
+    except ValueError:
+        return jsonify({"error": "Invalid lat/lon"}), 400
 
-    # Estimate population density
-    population_density = estimate_population_density(building_count, avg_floors, radius=5000, occupants_per_floor=30)
+    # Snap to the cache grid so nearby requests share cached results
+    query_lat, query_lon = quantize_coord(lat), quantize_coord(lon)
 
-    # Corrected function call by passing `building_count`
-    config = determine_5g_config(avg_speed, population_density, avg_floors, building_count)
+    stats = get_area_stats(query_lat, query_lon) or compute_area_stats(EMPTY_SUMMARY)
 
-    # Debugging logs
-    print(f"lat: {lat}, lon: {lon}, avg_speed: {avg_speed}, road_count: {road_count}, building_count: {building_count}, avg_floors: {avg_floors}")
-    print("Estimated Population Density:", population_density)
-    print("Determined configuration:", config)
+    # Debugging logs; arguments are only formatted when DEBUG logging is enabled
+    logger.debug(
+        "lat: %s, lon: %s, avg_speed: %s, road_count: %s, building_count: %s, avg_floors: %s, population_density: %s, config: %s",
+        lat, lon, stats["avg_speed"], stats["road_count"], stats["building_count"], stats["avg_floors"],
+        stats["population_density"], stats["config"]
+    )
 
     return jsonify({
         "lat": lat,
         "lon": lon,
-        "avg_speed": avg_speed,
-        "road_count": road_count,
-        "building_count": building_count,
-        "avg_floors": avg_floors,
-        "population_density": population_density,
-        "config": config,
+        **stats,
         "radius": 5000
     })
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    app.run(host="0.0.0.0", port=5000, debug=False)
@@ -1,37 +1,153 @@
 import argparse
+import contextlib
+import hashlib
 import os
 import requests
-import json
+import orjson
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import osm2geojson
 
-def fetch_osm_data(query, filename):
+CACHE_TTL = 24 * 60 * 60  # Seconds before an existing output file is fetched again
+WRITE_BUFFER_SIZE = 1 << 20  # Bytes buffered before each write to disk
+
+# Overpass query templates by query type, kept free of indentation so no whitespace is sent over the wire
+STATIC_QUERY_TEMPLATES = {
+    "road": (
+        '[out:json][timeout:25];'
+        'area["name"="{area_name}"]->.searchArea;'
+        '(way["highway"](area.searchArea););'
+        'out body;>;out skel qt;'
+    ),
+    "building": (
+        '[out:json][timeout:25];'
+        'area["name"="{area_name}"]->.searchArea;'
+        '(way["building"](area.searchArea);relation["building"](area.searchArea););'
+        'out body;>;out skel qt;'
+    )
+}
+DYNAMIC_QUERY_TEMPLATES = {
+    "road": (
+        '[out:json][timeout:25];'
+        '(way["highway"](around:{radius},{lat},{lon}););'
+        'out body;>;out skel qt;'
+    ),
+    "building": (
+        '[out:json][timeout:25];'
+        '(way["building"](around:{radius},{lat},{lon});relation["building"](around:{radius},{lat},{lon}););'
+        'out body;>;out skel qt;'
+    )
+}
+
+def query_stamp_path(filename):
+    """
+    Returns the file recording which query produced filename.
+    """
+    return filename + ".query"
+
+def query_digest(query):
+    """
+    Returns a short fingerprint of an Overpass query.
+    """
+    return hashlib.sha256(query.encode()).hexdigest()
+
+def is_fresh(filename, query, max_age):
+    """
+    Returns True if filename was written for this exact query less than max_age seconds ago.
+    Files without a query stamp, such as ones checked out from git, are never considered fresh.
+    """
+    try:
+        if time.time() - os.path.getmtime(filename) >= max_age:
+            return False
+        with open(query_stamp_path(filename)) as f:
+            return f.read() == query_digest(query)
+    except OSError:
+        return False
+
+def fetch_osm_data(query):
     """
-    Sends a query to the Overpass API and saves the returned JSON to a file.
+    Sends a query to the Overpass API and returns the parsed JSON, or None on error.
+    Overpass answers HTTP 200 with a "remark" when it hit its timeout or memory limit
+    and the elements are incomplete, so such responses are treated as errors too.
     """
     overpass_url = "http://overpass-api.de/api/interpreter"
-    print(f"Fetching data and saving to {filename}...")
     response = requests.get(overpass_url, params={'data': query})
-    if response.status_code == 200:
-        data = response.json()
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"Data successfully saved as {filename}")
-    else:
+    if response.status_code != 200:
         print(f"Error fetching data: HTTP {response.status_code}")
+        return None
+    osm_data = orjson.loads(response.content)
+    if "remark" in osm_data:
+        print(f"Error fetching data: {osm_data['remark']}")
+        return None
+    return osm_data
 
-def convert_to_geojson(input_filename, output_filename):
+def write_bytes(payload, filename):
     """
-    Reads an Overpass JSON file, converts it to GeoJSON, and saves the result.
+    Writes an already serialized JSON payload to a file.
     """
-    print(f"Converting {input_filename} to GeoJSON...")
-    with open(input_filename, "r", encoding="utf-8") as f:
-        osm_data = json.load(f)
+    with open(filename, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(payload)
+    print(f"Data successfully saved as {filename}")
+
+def save_osm_data(payload, filename, query):
+    """
+    Writes a serialized Overpass response, then stamps it with the query that produced it.
+    """
+    write_bytes(payload, filename)
+    with open(query_stamp_path(filename), "w") as f:
+        f.write(query_digest(query))
+
+def write_geojson(geojson_data, filename):
+    """
+    Writes a GeoJSON FeatureCollection compactly, serializing one feature at a time
+    so the whole document is never held in memory as a single string.
+    """
+    with open(filename, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(b'{"type":"FeatureCollection","features":[')
+        for i, feature in enumerate(geojson_data.get("features", [])):
+            if i:
+                f.write(b",")
+            f.write(orjson.dumps(feature))
+        f.write(b"]}")
+    print(f"GeoJSON successfully saved as {filename}")
+
+def extract(query, json_filename, geojson_filename, max_age=CACHE_TTL):
+    """
+    Fetches the data for a query and saves it both as Overpass JSON and as GeoJSON.
+    Skips the request if json_filename was written for the same query less than max_age seconds ago,
+    and the conversion if the GeoJSON file is newer than the JSON file.
+    """
+    writer = None
+    if is_fresh(json_filename, query, max_age):
+        print(f"{json_filename} is up to date, skipping fetch.")
+        if os.path.exists(geojson_filename) and os.path.getmtime(geojson_filename) >= os.path.getmtime(json_filename):
+            print(f"{geojson_filename} is up to date, skipping conversion.")
+            return
+        with open(json_filename, "rb") as f:
+            osm_data = orjson.loads(f.read())
+    else:
+        print(f"Fetching data and saving to {json_filename}...")
+        osm_data = fetch_osm_data(query)
+        if osm_data is None:
+            return
+        # Ensure output directory exists
+        os.makedirs(os.path.dirname(json_filename), exist_ok=True)
+        # Invalidate the previous stamp until the new file is completely written
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(query_stamp_path(json_filename))
+        # Serialize before converting: json2geojson adds keys to the dicts it is given.
+        # Only the disk write runs in the background while the data is converted in memory.
+        payload = orjson.dumps(osm_data)
+        writer = threading.Thread(target=save_osm_data, args=(payload, json_filename, query))
+        writer.start()
+
+    print(f"Converting {json_filename} to GeoJSON...")
     geojson_data = osm2geojson.json2geojson(osm_data)
-    with open(output_filename, "w", encoding="utf-8") as f:
-        json.dump(geojson_data, f, ensure_ascii=False, indent=2)
-    print(f"GeoJSON successfully saved as {output_filename}")
+    if writer is not None:
+        # Finish the JSON first so the GeoJSON file ends up the newer of the two
+        writer.join()
+    write_geojson(geojson_data, geojson_filename)
 
 def build_static_query(area_name, query_type):
     """
@@ -39,32 +155,9 @@ def build_static_query(area_name, query_type):
     
     query_type: "road" or "building"
     """
-    if query_type == "road":
-        query = f"""
-        [out:json][timeout:25];
-        area["name"="{area_name}"]->.searchArea;
-        (
-          way["highway"](area.searchArea);
-        );
-        out body;
-        >;
-        out skel qt;
-        """
-    elif query_type == "building":
-        query = f"""
-        [out:json][timeout:25];
-        area["name"="{area_name}"]->.searchArea;
-        (
-          way["building"](area.searchArea);
-          relation["building"](area.searchArea);
-        );
-        out body;
-        >;
-        out skel qt;
-        """
-    else:
+    if query_type not in STATIC_QUERY_TEMPLATES:
         raise ValueError("Invalid query_type. Use 'road' or 'building'.")
-    return query
+    return STATIC_QUERY_TEMPLATES[query_type].format(area_name=area_name)
 
 def build_dynamic_query(lat, lon, radius, query_type):
     """
@@ -72,30 +165,9 @@ def build_dynamic_query(lat, lon, radius, query_type):
     
     query_type: "road" or "building"
     """
-    if query_type == "road":
-        query = f"""
-        [out:json][timeout:25];
-        (
-          way["highway"](around:{radius},{lat},{lon});
-        );
-        out body;
-        >;
-        out skel qt;
-        """
-    elif query_type == "building":
-        query = f"""
-        [out:json][timeout:25];
-        (
-          way["building"](around:{radius},{lat},{lon});
-          relation["building"](around:{radius},{lat},{lon});
-        );
-        out body;
-        >;
-        out skel qt;
-        """
-    else:
+    if query_type not in DYNAMIC_QUERY_TEMPLATES:
         raise ValueError("Invalid query_type. Use 'road' or 'building'.")
-    return query
+    return DYNAMIC_QUERY_TEMPLATES[query_type].format(lat=lat, lon=lon, radius=radius)
 
 def main():
     parser = argparse.ArgumentParser(description="Fetch OSM data from Overpass API and convert to GeoJSON.")
@@ -109,6 +181,8 @@ def main():
                         help="Longitude for dynamic mode")
     parser.add_argument("--radius", type=int, default=500, 
                         help="Search radius in meters for dynamic mode (default: 500)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Fetch data again even if the output files are less than a day old")
     args = parser.parse_args()
 
     if args.mode == "static":
@@ -140,11 +214,15 @@ def main():
         road_geojson = f"output/road_network_{lat}_{lon}.geojson"
         building_geojson = f"output/buildings_{lat}_{lon}.geojson"
 
-    # Fetch data and convert to GeoJSON
-    fetch_osm_data(road_query, road_json)
-    fetch_osm_data(building_query, building_json)
-    convert_to_geojson(road_json, road_geojson)
-    convert_to_geojson(building_json, building_geojson)
+    # Fetch data and convert to GeoJSON; roads and buildings are independent, so run both pipelines at once
+    max_age = 0 if args.refresh else CACHE_TTL
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(extract, road_query, road_json, road_geojson, max_age),
+            executor.submit(extract, building_query, building_json, building_geojson, max_age)
+        ]
+        for future in futures:
+            future.result()
 
 if __name__ == "__main__":
     main()
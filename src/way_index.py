@@ -0,0 +1,140 @@
+import contextlib
+import itertools
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from rtree import index
+
+TILE_DEGREES = 0.05  # ~5.5 km; ways are downloaded, cached and indexed one grid tile at a time
+EARTH_RADIUS = 6371000  # Meters
+
+def tile_of(lat, lon):
+    """Returns the (row, column) of the grid tile containing lat/lon."""
+    return (math.floor(lat / TILE_DEGREES), math.floor(lon / TILE_DEGREES))
+
+def tile_bounds(tile):
+    """Returns the (south, west, north, east) bounds of a grid tile."""
+    row, column = tile
+    return (row * TILE_DEGREES, column * TILE_DEGREES, (row + 1) * TILE_DEGREES, (column + 1) * TILE_DEGREES)
+
+def tiles_covering(south, west, north, east):
+    """Lists the grid tiles intersecting a bounding box."""
+    min_row, min_column = tile_of(south, west)
+    max_row, max_column = tile_of(north, east)
+    # A box ending exactly at 90° or 180° would otherwise include a tile beyond the edge of the map
+    last_row, last_column = tile_of(90 - TILE_DEGREES / 2, 180 - TILE_DEGREES / 2)
+    max_row, max_column = min(max_row, last_row), min(max_column, last_column)
+    return [
+        (row, column)
+        for row in range(min_row, max_row + 1)
+        for column in range(min_column, max_column + 1)
+    ]
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """Approximates the distance in meters between two nearby points with an equirectangular projection."""
+    lon_delta = (lon2 - lon1 + 180) % 360 - 180  # Shortest way around, across the antimeridian if needed
+    x = math.radians(lon_delta) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return EARTH_RADIUS * math.hypot(x, y)
+
+class WayIndex:
+    """
+    In-process R-tree over the centers of downloaded ways.
+
+    Ways are added one tile at a time, with every way crossing that tile, so an
+    area whose tiles are all loaded can be answered locally. Records are
+    (way id, center lat, center lon, is road, is building, maxspeed tag, levels tag).
+    """
+
+    def __init__(self, ttl, max_records):
+        self._ttl = ttl
+        self._max_records = max_records
+        self._index = index.Index()
+        self._tiles = OrderedDict()  # tile -> (load time, entry ids), least recently used first
+        # R-tree entry id -> (tile, record). Entry ids are unique per insertion because a way crossing
+        # several tiles is indexed once under each of them.
+        self._records = {}
+        self._entry_ids = itertools.count()
+        self._record_count = 0
+        self._pins = Counter()  # tile -> number of requests in progress that need it
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def pinned(self, tiles):
+        """
+        Keeps tiles from being evicted while the block runs, so a request can load all of its tiles and
+        query them even when together they hold more than max_records. The index shrinks back to
+        max_records as later tiles are added.
+        """
+        with self._lock:
+            self._pins.update(tiles)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pins.subtract(tiles)
+                self._pins += Counter()  # Drop tiles no longer pinned
+
+    def has_tile(self, tile):
+        """Returns True if the tile is loaded and younger than the TTL."""
+        with self._lock:
+            entry = self._tiles.get(tile)
+            if entry is None:
+                return False
+            if time.time() - entry[0] > self._ttl:
+                self._remove_tile(tile)
+                return False
+            self._tiles.move_to_end(tile)
+            return True
+
+    def add_tile(self, tile, records, loaded_at=None):
+        """
+        Indexes the records of a tile, replacing any previous version and evicting the least recently used
+        tiles until at most max_records are indexed (the new tile itself and pinned tiles are always kept). loaded_at is when the records were downloaded (defaults to now); the tile expires ttl seconds after it.
+        """
+        with self._lock:
+            if tile in self._tiles:
+                self._remove_tile(tile)
+            entry_ids = []
+            for record in records:
+                entry_id = next(self._entry_ids)
+                lat, lon = record[1], record[2]
+                self._index.insert(entry_id, (lon, lat, lon, lat))
+                self._records[entry_id] = (tile, record)
+                entry_ids.append(entry_id)
+            self._tiles[tile] = (time.time() if loaded_at is None else loaded_at, entry_ids)
+            self._record_count += len(entry_ids)
+            if self._record_count > self._max_records:
+                evictable = [t for t in self._tiles if t != tile and not self._pins[t]]
+                for old_tile in evictable:
+                    if self._record_count <= self._max_records:
+                        break
+                    self._remove_tile(old_tile)
+
+    def _remove_tile(self, tile):
+        _, entry_ids = self._tiles.pop(tile)
+        self._record_count -= len(entry_ids)
+        for entry_id in entry_ids:
+            _, record = self._records.pop(entry_id)
+            lat, lon = record[1], record[2]
+            self._index.delete(entry_id, (lon, lat, lon, lat))
+
+    def query(self, lat, lon, radius, bboxes, tiles):
+        """
+        Returns the records of ways crossing tiles whose center lies inside bboxes and within radius meters of lat/lon, once per way id.
+        Ways indexed only under other tiles are left out, so the result does not depend on which other tiles are loaded.
+        Returns None if any of tiles is no longer indexed, e.g. because it expired or was evicted before being pinned.
+        """
+        tiles = set(tiles)
+        with self._lock:
+            if any(tile not in self._tiles for tile in tiles):
+                return None
+            entries = [
+                self._records[entry_id]
+                for south, west, north, east in bboxes
+                for entry_id in self._index.intersection((west, south, east, north))
+            ]
+        records = [record for tile, record in entries if tile in tiles]
+        ways = {record[0]: record for record in records if distance_m(lat, lon, record[1], record[2]) <= radius}
+        return list(ways.values())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app modules live in src/ and import each other by module name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
@@ -0,0 +1,121 @@
+import way_index
+from way_index import WayIndex
+
+def record(way_id, lat, lon, is_road=True, is_building=False, maxspeed=None, levels=None):
+    return (way_id, lat, lon, is_road, is_building, maxspeed, levels)
+
+BBOXES = [(-1.0, -1.0, 1.0, 1.0)]
+
+def test_query_returns_ways_within_radius():
+    index = WayIndex(ttl=60, max_records=100)
+    index.add_tile((0, 0), [record(1, 0.0, 0.0), record(2, 0.01, 0.0), record(3, 0.5, 0.5)])
+    found = sorted(r[0] for r in index.query(0.0, 0.0, 2000, BBOXES, [(0, 0)]))
+    assert found == [1, 2]
+
+def test_add_tile_replaces_previous_version():
+    index = WayIndex(ttl=60, max_records=100)
+    index.add_tile((0, 0), [record(1, 0.0, 0.0), record(2, 0.01, 0.0)])
+    index.add_tile((0, 0), [record(3, 0.0, 0.0)])
+    assert [r[0] for r in index.query(0.0, 0.0, 5000, BBOXES, [(0, 0)])] == [3]
+
+def test_same_way_in_two_tiles_is_returned_once_and_survives_removal():
+    index = WayIndex(ttl=60, max_records=100)
+    index.add_tile((0, 0), [record(7, 0.0, 0.0)])
+    index.add_tile((0, 1), [record(7, 0.0, 0.06)])
+    assert [r[0] for r in index.query(0.0, 0.0, 10000, BBOXES, [(0, 0), (0, 1)])] == [7]
+    index._remove_tile((0, 1))
+    assert [r[0] for r in index.query(0.0, 0.0, 10000, BBOXES, [(0, 0)])] == [7]
+
+def test_least_recently_used_tile_is_evicted():
+    index = WayIndex(ttl=60, max_records=2)
+    index.add_tile((0, 0), [record(1, 0.0, 0.0)])
+    index.add_tile((0, 1), [record(2, 0.0, 0.06)])
+    assert index.has_tile((0, 0))  # Marks (0, 0) as recently used
+    index.add_tile((0, 2), [record(3, 0.0, 0.11)])
+    assert index.has_tile((0, 0))
+    assert not index.has_tile((0, 1))
+    assert sorted(r[0] for r in index.query(0.0, 0.0, 20000, BBOXES, [(0, 0), (0, 2)])) == [1, 3]
+
+def test_eviction_is_bounded_by_record_count():
+    index = WayIndex(ttl=60, max_records=4)
+    index.add_tile((0, 0), [record(1, 0.0, 0.0), record(2, 0.0, 0.01)])
+    index.add_tile((0, 1), [record(3, 0.0, 0.06)])
+    assert index.has_tile((0, 0))
+    index.add_tile((0, 2), [record(4, 0.0, 0.11), record(5, 0.0, 0.12)])
+    assert not index.has_tile((0, 1))
+    assert index.has_tile((0, 0))
+    assert index.has_tile((0, 2))
+
+def test_tile_larger_than_the_limit_is_kept_alone():
+    index = WayIndex(ttl=60, max_records=1)
+    index.add_tile((0, 0), [record(1, 0.0, 0.0)])
+    index.add_tile((0, 1), [record(2, 0.0, 0.06), record(3, 0.0, 0.07)])
+    assert not index.has_tile((0, 0))
+    assert index.has_tile((0, 1))
+
+def test_query_returns_none_when_a_tile_is_missing():
+    index = WayIndex(ttl=60, max_records=100)
+    index.add_tile((0, 0), [record(1, 0.0, 0.0)])
+    assert index.query(0.0, 0.0, 1000, BBOXES, [(0, 0), (0, 1)]) is None
+
+def test_tile_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(way_index.time, "time", lambda: now[0])
+    index = WayIndex(ttl=60, max_records=100)
+    index.add_tile((0, 0), [record(1, 0.0, 0.0)])
+    now[0] += 59
+    assert index.has_tile((0, 0))
+    now[0] += 2
+    assert not index.has_tile((0, 0))
+    assert index.query(0.0, 0.0, 1000, BBOXES, []) == []
+
+def test_tile_expires_relative_to_its_download_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(way_index.time, "time", lambda: now[0])
+    index = WayIndex(ttl=60, max_records=100)
+    index.add_tile((0, 0), [record(1, 0.0, 0.0)], loaded_at=950.0)
+    assert index.has_tile((0, 0))
+    now[0] += 11
+    assert not index.has_tile((0, 0))
+
+def test_query_across_the_antimeridian():
+    index = WayIndex(ttl=60, max_records=100)
+    east_tile, west_tile = way_index.tile_of(0.0, 179.99), way_index.tile_of(0.0, -179.99)
+    index.add_tile(east_tile, [record(1, 0.0, 179.99)])
+    index.add_tile(west_tile, [record(2, 0.0, -179.99)])
+    bboxes = [(-0.05, 179.95, 0.05, 180.0), (-0.05, -180.0, 0.05, -179.95)]
+    found = index.query(0.0, 179.995, 2000, bboxes, [east_tile, west_tile])
+    assert sorted(r[0] for r in found) == [1, 2]
+
+def test_distance_wraps_around_the_antimeridian():
+    assert way_index.distance_m(0.0, 179.99, 0.0, -179.99) < 3000
+
+def test_tiles_covering_stops_at_the_edge_of_the_map():
+    tiles = way_index.tiles_covering(89.96, 179.96, 90.0, 180.0)
+    assert tiles == [way_index.tile_of(89.97, 179.97)]
+
+def test_pinned_tiles_are_not_evicted():
+    index = WayIndex(ttl=60, max_records=1)
+    tiles = [(0, 0), (0, 1), (0, 2)]
+    with index.pinned(tiles):
+        for column, tile in enumerate(tiles):
+            index.add_tile(tile, [record(column, 0.0, 0.06 * column)])
+        assert sorted(r[0] for r in index.query(0.0, 0.0, 20000, BBOXES, tiles)) == [0, 1, 2]
+    index.add_tile((0, 3), [record(3, 0.0, 0.16)])
+    assert [tile for tile in tiles + [(0, 3)] if index.has_tile(tile)] == [(0, 3)]
+
+def test_tile_pinned_by_another_request_stays_pinned():
+    index = WayIndex(ttl=60, max_records=1)
+    with index.pinned([(0, 0)]):
+        with index.pinned([(0, 0), (0, 1)]):
+            index.add_tile((0, 0), [record(1, 0.0, 0.0)])
+        index.add_tile((0, 1), [record(2, 0.0, 0.06)])
+        assert index.has_tile((0, 0))
+
+def test_query_ignores_ways_indexed_only_under_other_tiles():
+    index = WayIndex(ttl=60, max_records=100)
+    # Way 2 is centered in (0, 0) but only crosses (0, 1)
+    index.add_tile((0, 0), [record(1, 0.0, 0.0)])
+    index.add_tile((0, 1), [record(2, 0.0, 0.01)])
+    assert [r[0] for r in index.query(0.0, 0.0, 5000, BBOXES, [(0, 0)])] == [1]
+    assert sorted(r[0] for r in index.query(0.0, 0.0, 5000, BBOXES, [(0, 0), (0, 1)])) == [1, 2]